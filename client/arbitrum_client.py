@@ -2,76 +2,83 @@
 Arbitrum Bridge Client with dynamic pricing
 """
 
+import asyncio
 import logging
-from typing import Dict, Any
+from decimal import Decimal
+from typing import Dict, Any, Optional, Tuple, Union
+import aiohttp
+from eth_abi import encode
 from web3 import Web3
+from eth_utils import function_signature_to_4byte_selector
 from eth_utils.address import to_checksum_address
 
-from .base_client import BaseBridgeClient
+from .base_client import BaseBridgeClient, eth_to_wei, is_rate_limited, is_transient
 
 logger = logging.getLogger(__name__)
 
+# Inbox.createRetryableTicket, encoded by hand to skip web3's contract dispatcher
+CREATE_RETRYABLE_TICKET_SELECTOR = function_signature_to_4byte_selector(
+    "createRetryableTicket(address,uint256,uint256,address,address,uint256,uint256,bytes)"
+)
+CREATE_RETRYABLE_TICKET_TYPES = [
+    'address',  # to
+    'uint256',  # l2CallValue
+    'uint256',  # maxSubmissionCost
+    'address',  # excessFeeRefundAddress
+    'address',  # callValueRefundAddress
+    'uint256',  # gasLimit
+    'uint256',  # maxFeePerGas
+    'bytes'     # data
+]
+
 
 class ArbitrumBridgeClient(BaseBridgeClient):
     """Client for Arbitrum Bridge operations"""
     
-    def __init__(self, config: Dict[str, Any]):
-        super().__init__(config)
+    def __init__(self, config: Dict[str, Any], private_key: Optional[str] = None, session: Optional[aiohttp.ClientSession] = None):
+        super().__init__(config, private_key, session)
         self.bridge_contract = config['arbitrum']['contract_address']
+        self._checksum_bridge = to_checksum_address(self.bridge_contract)
         self.gas_multiplier = config['bridge']['gas_multiplier']
-        
-        # L2 RPC connection
-        self.l2_rpc_url = config['networks']['rpcs']['Arbitrum_Sepolia']
-        self.w3_l2 = Web3(Web3.HTTPProvider(self.l2_rpc_url))
-        
-        # Inbox contract ABI
-        self.INBOX_ABI = [
-            {
-                "inputs": [
-                    {"internalType": "address", "name": "to", "type": "address"},
-                    {"internalType": "uint256", "name": "l2CallValue", "type": "uint256"},
-                    {"internalType": "uint256", "name": "maxSubmissionCost", "type": "uint256"},
-                    {"internalType": "address", "name": "excessFeeRefundAddress", "type": "address"},
-                    {"internalType": "address", "name": "callValueRefundAddress", "type": "address"},
-                    {"internalType": "uint256", "name": "gasLimit", "type": "uint256"},
-                    {"internalType": "uint256", "name": "maxFeePerGas", "type": "uint256"},
-                    {"internalType": "bytes", "name": "data", "type": "bytes"}
-                ],
-                "name": "createRetryableTicket",
-                "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
-                "stateMutability": "payable",
-                "type": "function"
-            }
-        ]
     
     def calculate_submission_cost(self, gas_prices: dict) -> int:
         """Calculates dynamic submission cost"""
-        web3 = self._get_web3("Ethereum")
-        base_cost = web3.to_wei(0.001, 'ether')
+        base_cost = Web3.to_wei(0.001, 'ether')
         gas_adjustment = min(gas_prices['gas_price'] / 20000000000, 2.0)
         return int(base_cost * gas_adjustment)
 
-    def get_l2_gas_params(self) -> tuple:
+    async def get_l2_gas_params(self) -> tuple:
         """Gets L2 gas parameters"""
         try:
-            l2_gas_price = self.w3_l2.eth.gas_price
+            w3_l2 = await self._get_web3("Arbitrum_Sepolia")
+            l2_gas_price = await w3_l2.eth.gas_price
         except Exception:
             l2_gas_price = 100000000  # 0.1 gwei fallback
         return 500000, l2_gas_price
 
-    async def perform_bridge(self, to_address: str, amount: float) -> Dict[str, Any]:
+    async def perform_bridge(self, to_address: str, amount: Union[str, float, Decimal], wallet_state: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
         """Performs bridge with dynamic pricing"""
+        # Once the raw transaction may have reached the node a retry could double-spend
+        broadcast = False
+        # Set once a nonce is reserved, released however the bridge ends
+        nonce = None
+        failed = False
         try:
-            web3 = self._get_web3("Ethereum")
-            gas_prices = self.get_current_gas_prices(web3)
-            amount_wei = int(amount * 10**18)
+            web3 = await self._get_web3("Ethereum")
+            
+            # L1 pre-flight batch and L2 gas price are independent, overlap them
+            tx_context, (gas_limit_l2, gas_price_l2) = await asyncio.gather(
+                self._prefetch_tx_context(web3, wallet_state),
+                self.get_l2_gas_params()
+            )
+            gas_prices = self.get_current_gas_prices(tx_context)
+            amount_wei = eth_to_wei(amount)
             
             submission_cost = self.calculate_submission_cost(gas_prices)
-            gas_limit_l2, gas_price_l2 = self.get_l2_gas_params()
             required_value = amount_wei + submission_cost + (gas_limit_l2 * gas_price_l2)
             
             gas_estimate = self.config['arbitrum']['default_gas_limit']
-            balance_check = self.check_wallet_balance(web3, self.address, required_value, gas_prices, gas_estimate)
+            balance_check = self.check_wallet_balance(tx_context['balance'], required_value, gas_prices, gas_estimate)
             if not balance_check['sufficient']:
                 return {
                     'success': False, 
@@ -79,38 +86,29 @@ class ArbitrumBridgeClient(BaseBridgeClient):
                     'balance_info': balance_check
                 }
             
-            inbox_contract = web3.eth.contract(
-                address=to_checksum_address(self.bridge_contract),
-                abi=self.INBOX_ABI
-            )
-            
-            transaction = inbox_contract.functions.createRetryableTicket(
-                to_checksum_address(self.address), amount_wei, submission_cost,
-                to_checksum_address(self.address), to_checksum_address(self.address),
+            calldata = CREATE_RETRYABLE_TICKET_SELECTOR + encode(CREATE_RETRYABLE_TICKET_TYPES, [
+                self.address, amount_wei, submission_cost,
+                self.address, self.address,
                 gas_limit_l2, gas_price_l2, b''
-            ).build_transaction({
-                'from': self.address,
+            ])
+            
+            nonce = self._reserve_nonce(tx_context['nonce'])
+            transaction = {
+                'to': self._checksum_bridge,
+                'data': calldata,
                 'value': required_value,
                 'gas': gas_estimate,
                 'maxPriorityFeePerGas': gas_prices['max_priority_fee'],
                 'maxFeePerGas': gas_prices['max_fee_per_gas'],
-                'nonce': web3.eth.get_transaction_count(self.address, 'pending'),
-                'chainId': 11155111,
+                'nonce': nonce,
+                'chainId': self.chain_id,
                 'type': 2
-            })
-            
-            signed_txn = web3.eth.account.sign_transaction(transaction, self.private_key)
-            
-            # Handle both Web3.py versions for transaction attribute
-            try:
-                raw_transaction = signed_txn.raw_transaction
-            except AttributeError:
-                raw_transaction = signed_txn.rawTransaction
+            }
             
-            tx_hash = web3.eth.send_raw_transaction(raw_transaction)
-            tx_hash_hex = tx_hash.hex()
+            raw_transaction = self._sign_transaction(transaction)
             
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
+            broadcast = True
+            tx_hash_hex, receipt = await self._send_and_wait(web3, raw_transaction)
             
             if receipt['status'] == 1:
                 return {
@@ -124,4 +122,13 @@ class ArbitrumBridgeClient(BaseBridgeClient):
                 return {'success': False, 'error': 'Transaction failed'}
                 
         except Exception as e:
-            return {'success': False, 'error': str(e)}
\ No newline at end of file
+            failed = True
+            return {
+                'success': False,
+                'error': str(e),
+                'rate_limited': is_rate_limited(e),
+                'retryable': not broadcast and is_transient(e)
+            }
+        finally:
+            if nonce is not None:
+                self._release_nonce(failed)
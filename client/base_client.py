@@ -2,11 +2,19 @@
 Base class for bridge clients
 """
 
+import asyncio
 import logging
-from abc import ABC, abstractmethod
-from typing import Dict, Any
-from web3 import Web3
+import time
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Set, Tuple, Union
+import aiohttp
+from hexbytes import HexBytes
+from web3 import AsyncWeb3, Web3
+from web3.exceptions import MethodUnavailable, TransactionNotFound
 from eth_account import Account
+from eth_account.datastructures import SignedTransaction
+from eth_keys import keys
+from eth_utils import keccak
 from eth_utils.address import to_checksum_address
 
 import sys
@@ -16,76 +24,195 @@ from config import get_config
 
 logger = logging.getLogger(__name__)
 
+WEI_PER_ETH = 10**18
 
-class BaseBridgeClient(ABC):
+# eth-account < 0.13 names the signed payload rawTransaction
+RAW_TX_ATTR = 'raw_transaction' if hasattr(SignedTransaction, 'raw_transaction') else 'rawTransaction'
+
+# Base fee only changes once per block (~12s), reuse fee inputs for a few seconds
+GAS_CACHE_TTL = 3.0
+
+# Used when the node's fee inputs are unavailable
+FALLBACK_GAS_PRICES = {
+    'base_fee': 20000000000,    # 20 gwei
+    'gas_price': 25000000000,   # 25 gwei  
+    'max_priority_fee': 2000000000,  # 2 gwei
+    'max_fee_per_gas': 22000000000,  # 22 gwei
+    'base_fee_trend': 0
+}
+
+
+def eth_to_wei(amount: Union[str, float, Decimal]) -> int:
+    """Converts ETH amount to wei via Decimal to avoid float rounding"""
+    return int(Decimal(str(amount)) * WEI_PER_ETH)
+
+
+def compute_fees(base_fee_current: int, base_fee_prev: int, gas_price: int) -> Tuple[int, int, float]:
+    """Pure EIP-1559 fee calculation, returns (priority_fee, max_fee, base_fee_trend)"""
+    # Calculate trend
+    base_fee_trend = (base_fee_current - base_fee_prev) / base_fee_prev if base_fee_prev > 0 else 0
+    
+    # Dynamic priority fee
+    min_priority_fee = 1000000000  # 1 gwei minimum
+    max_priority_fee = 5000000000  # 5 gwei maximum
+    
+    if base_fee_trend > 0.1:  # Base fee growing fast
+        priority_fee = max_priority_fee
+    elif gas_price > base_fee_current * 1.5:  # High network congestion
+        priority_fee = int(min_priority_fee * 3)  # 3 gwei
+    else:
+        priority_fee = 2000000000  # 2 gwei default
+    
+    priority_fee = max(min_priority_fee, min(priority_fee, max_priority_fee))
+    
+    # Calculate max fee with buffer
+    base_fee_buffer = 1.3 if base_fee_trend > 0 else 1.1
+    max_fee = int(base_fee_current * base_fee_buffer + priority_fee)
+    
+    return priority_fee, max_fee, base_fee_trend
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """True if the RPC node rejected the request with HTTP 429"""
+    return isinstance(error, aiohttp.ClientResponseError) and error.status == 429
+
+
+def is_transient(error: Exception) -> bool:
+    """True for network errors, timeouts and HTTP 429/5xx that may pass on retry"""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+class BaseBridgeClient:
     """Base class for bridge clients"""
     
-    def __init__(self, config: Dict[str, Any]):
+    # Fee inputs per RPC URL: url -> (monotonic timestamp, fee inputs), shared by all clients
+    _gas_cache: Dict[str, tuple] = {}
+    # RPC URLs that answered eth_sendRawTransactionSync with "method not found",
+    # shared by all clients so only the first wallet pays for the probe
+    _sync_send_unsupported: Set[str] = set()
+    
+    def __init__(self, config: Dict[str, Any], private_key: Optional[str] = None, session: Optional[aiohttp.ClientSession] = None):
+        # Config is shared and read-only, the wallet key is passed separately
         self.config = config
-        self.private_key = config['wallet']['ethereum_private_key']
-        self.account = Account.from_key(self.private_key)
-        self.address = self.account.address
-        self.web3_instances: Dict[str, Web3] = {}
+        self.private_key = private_key or config['wallet']['ethereum_private_key']
+        # Parsed once and shared with the LocalAccount: signing with a PrivateKey
+        # object skips the per-call hex parsing and public key derivation
+        self._signing_key = keys.PrivateKey(HexBytes(self.private_key))
+        self.account = Account.from_key(self._signing_key)
+        # Checksummed once, reused as-is in every transaction
+        self.address = to_checksum_address(self.account.address)
+        # Source chain is always Ethereum Sepolia, no need to ask the node
+        self.chain_id = config['networks']['chain_ids']['Ethereum']
+        self.web3_instances: Dict[str, AsyncWeb3] = {}
+        # Single aiohttp session shared by L1 and L2 providers: injected by the
+        # caller (shared across clients) or created on first use and owned here
+        self._session = session
+        self._owns_session = session is None
+        # Next nonce to hand out while bridges of this client are in flight
+        self._next_nonce: Optional[int] = None
+        # Bridges holding a reserved nonce, and whether one of them failed since
+        # the counter was last synced with the node
+        self._nonces_in_flight = 0
+        self._nonce_resync = False
     
-    def _get_web3(self, chain: str) -> Web3:
-        """Gets or creates Web3 instance for network"""
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Gets or creates the HTTP session shared by all providers"""
+        if self._owns_session and (self._session is None or self._session.closed):
+            self._session = aiohttp.ClientSession()
+        return self._session
+    
+    async def close(self):
+        """Closes the HTTP session if this client created it"""
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+    
+    async def _get_web3(self, chain: str) -> AsyncWeb3:
+        """Gets or creates async Web3 instance for network"""
         if chain not in self.web3_instances:
             rpc_url = self.config['networks']['rpcs'].get(chain)
             if not rpc_url:
                 raise ValueError(f"RPC URL not found for network {chain}")
             
-            self.web3_instances[chain] = Web3(Web3.HTTPProvider(rpc_url))
-            
-            # Check connection
-            try:
-                web3_instance = self.web3_instances[chain]
-                if not web3_instance.is_connected():
-                    raise ConnectionError(f"Failed to connect to {chain}")
-            except Exception as e:
-                raise ConnectionError(f"Failed to connect to {chain}: {e}")
+            # No is_connected() probe: the first real RPC call surfaces connection errors
+            provider = AsyncWeb3.AsyncHTTPProvider(rpc_url)
+            await provider.cache_async_session(await self._get_session())
+            self.web3_instances[chain] = AsyncWeb3(provider)
         
         return self.web3_instances[chain]
     
-    def get_current_gas_prices(self, web3_instance: Web3) -> Dict[str, Any]:
-        """Gets current gas prices with EIP-1559 calculation"""
-        try:
-            latest_block = web3_instance.eth.get_block('latest')
-            block_number = latest_block.get('number', 0)
-            
-            if block_number > 0:
-                prev_block = web3_instance.eth.get_block(block_number - 1)
-            else:
-                prev_block = latest_block
-            
-            base_fee_current = latest_block.get('baseFeePerGas', 0)
-            base_fee_prev = prev_block.get('baseFeePerGas', 0)
-            
-            # Calculate trend
-            base_fee_trend = (base_fee_current - base_fee_prev) / base_fee_prev if base_fee_prev > 0 else 0
-            
-            gas_price = web3_instance.eth.gas_price
-            
-            # Dynamic priority fee
-            min_priority_fee = 1000000000  # 1 gwei minimum
-            max_priority_fee = 5000000000  # 5 gwei maximum
-            
-            if base_fee_trend > 0.1:  # Base fee growing fast
-                priority_fee = max_priority_fee
-            elif gas_price > base_fee_current * 1.5:  # High network congestion
-                priority_fee = int(min_priority_fee * 3)  # 3 gwei
-            else:
-                priority_fee = 2000000000  # 2 gwei default
+    async def _execute_prefetch(self, web3_instance: AsyncWeb3, want_state: bool, want_fees: bool) -> list:
+        """Sends the requested pre-flight calls as one JSON-RPC batch"""
+        # eth_feeHistory returns the base fees of both blocks in a single call,
+        # so the previous block no longer depends on the latest block number
+        async with web3_instance.batch_requests() as batch:
+            if want_state:
+                batch.add(web3_instance.eth.get_balance(self.address, 'pending'))
+                batch.add(web3_instance.eth.get_transaction_count(self.address, 'pending'))
+            if want_fees:
+                batch.add(web3_instance.eth.fee_history(2, 'latest'))
+                batch.add(web3_instance.eth.gas_price)
+            return await batch.async_execute()
+    
+    async def _prefetch_tx_context(self, web3_instance: AsyncWeb3, wallet_state: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
+        """Fetches fee inputs, balance and nonce in one batched RPC round-trip
+        
+        wallet_state is an already fetched (balance, nonce) pair, e.g. from a
+        multi-wallet pre-flight batch; when given only fee inputs are requested.
+        If the fee inputs can't be fetched they are left out and
+        get_current_gas_prices falls back to default prices.
+        """
+        rpc_url = web3_instance.provider.endpoint_uri
+        cached = self._gas_cache.get(rpc_url)
+        fee_inputs = cached[1] if cached and time.monotonic() - cached[0] < GAS_CACHE_TTL else None
+        
+        want_state, want_fees = wallet_state is None, fee_inputs is None
+        if want_state or want_fees:
+            try:
+                results = await self._execute_prefetch(web3_instance, want_state, want_fees)
+            except Exception as e:
+                if not want_fees:
+                    raise
+                # Fee inputs are optional, balance and nonce are not: retry without fees
+                logger.warning(f"Failed to get fee inputs, using default gas prices: {e}")
+                want_fees, fee_inputs = False, {}
+                results = await self._execute_prefetch(web3_instance, want_state, False) if want_state else []
             
-            priority_fee = max(min_priority_fee, min(priority_fee, max_priority_fee))
+            if want_state:
+                wallet_state, results = tuple(results[:2]), results[2:]
             
-            # Calculate max fee with buffer
-            base_fee_buffer = 1.3 if base_fee_trend > 0 else 1.1
-            max_fee = int(base_fee_current * base_fee_buffer + priority_fee)
+            if want_fees:
+                fee_history, gas_price = results
+                # baseFeePerGas = [block n-1, block n, next block]
+                base_fees = fee_history['baseFeePerGas']
+                fee_inputs = {
+                    'base_fee_current': base_fees[1],
+                    'base_fee_prev': base_fees[0],
+                    'gas_price': gas_price
+                }
+                self._gas_cache[rpc_url] = (time.monotonic(), fee_inputs)
+        
+        balance, nonce = wallet_state
+        return {**fee_inputs, 'balance': balance, 'nonce': nonce}
+    
+    def get_current_gas_prices(self, tx_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Calculates EIP-1559 gas prices from prefetched fee inputs"""
+        if 'base_fee_current' not in tx_context:
+            # Fee fetch failed, already logged by _prefetch_tx_context
+            return dict(FALLBACK_GAS_PRICES)
+        try:
+            base_fee_current = tx_context['base_fee_current']
+            gas_price = tx_context['gas_price']
+            priority_fee, max_fee, base_fee_trend = compute_fees(
+                base_fee_current, tx_context['base_fee_prev'], gas_price
+            )
             
-            logger.debug(f"Gas price calculation:")
-            logger.debug(f"  Base fee: {base_fee_current} wei ({base_fee_current/10**9:.2f} gwei)")
-            logger.debug(f"  Priority fee: {priority_fee} wei ({priority_fee/10**9:.2f} gwei)")
-            logger.debug(f"  Max fee: {max_fee} wei ({max_fee/10**9:.2f} gwei)")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Gas price calculation:")
+                logger.debug(f"  Base fee: {base_fee_current} wei ({base_fee_current/10**9:.2f} gwei)")
+                logger.debug(f"  Priority fee: {priority_fee} wei ({priority_fee/10**9:.2f} gwei)")
+                logger.debug(f"  Max fee: {max_fee} wei ({max_fee/10**9:.2f} gwei)")
             
             return {
                 'base_fee': base_fee_current,
@@ -96,34 +223,26 @@ class BaseBridgeClient(ABC):
             }
         except Exception as e:
             logger.warning(f"Failed to get gas prices: {e}")
-            # Fallback values
-            return {
-                'base_fee': 20000000000,    # 20 gwei
-                'gas_price': 25000000000,   # 25 gwei  
-                'max_priority_fee': 2000000000,  # 2 gwei
-                'max_fee_per_gas': 22000000000,  # 22 gwei
-                'base_fee_trend': 0
-            }
+            return dict(FALLBACK_GAS_PRICES)
     
-    def check_wallet_balance(self, web3_instance: Web3, address: str, required_value: int, gas_prices: dict, gas_limit: int) -> Dict[str, Any]:
+    def check_wallet_balance(self, balance: int, required_value: int, gas_prices: dict, gas_limit: int) -> Dict[str, Any]:
         """Checks if wallet has sufficient funds and returns detailed balance info"""
         try:
-            balance = web3_instance.eth.get_balance(to_checksum_address(address))
             gas_cost = gas_limit * gas_prices['max_fee_per_gas']
             total_needed = required_value + gas_cost
             
             balance_info = {
                 'sufficient': balance >= total_needed,
-                'balance_eth': balance / 10**18,
-                'required_eth': total_needed / 10**18,
-                'bridge_amount_eth': required_value / 10**18,
-                'gas_cost_eth': gas_cost / 10**18
+                'balance_eth': balance / WEI_PER_ETH,
+                'required_eth': total_needed / WEI_PER_ETH,
+                'bridge_amount_eth': required_value / WEI_PER_ETH,
+                'gas_cost_eth': gas_cost / WEI_PER_ETH
             }
             
-            logger.debug(f"Balance check for {address}:")
-            logger.debug(f"  Balance: {balance_info['balance_eth']:.6f} ETH")
-            logger.debug(f"  Required: {balance_info['required_eth']:.6f} ETH")
-            logger.debug(f"  Sufficient: {'YES' if balance_info['sufficient'] else 'NO'}")
+            logger.debug("Balance check for %s:", self.address)
+            logger.debug("  Balance: %.6f ETH", balance_info['balance_eth'])
+            logger.debug("  Required: %.6f ETH", balance_info['required_eth'])
+            logger.debug("  Sufficient: %s", 'YES' if balance_info['sufficient'] else 'NO')
             
             return balance_info
             
@@ -138,7 +257,81 @@ class BaseBridgeClient(ABC):
                 'error': str(e)
             }
     
-    @abstractmethod
-    async def perform_bridge(self, to_address: str, amount: float) -> Dict[str, Any]:
-        """Abstract method for performing bridge"""
-        pass
\ No newline at end of file
+    def _reserve_nonce(self, pending_nonce: int) -> int:
+        """Picks the next nonce, skipping nonces already used by concurrent bridges"""
+        nonce = pending_nonce if self._next_nonce is None else max(pending_nonce, self._next_nonce)
+        self._next_nonce = nonce + 1
+        self._nonces_in_flight += 1
+        return nonce
+    
+    def _release_nonce(self, failed: bool):
+        """Ends a bridge that reserved a nonce, resyncing with the node after a failure
+        
+        The resync waits until no other bridge of this client holds a nonce, since
+        the node's pending nonce doesn't include transactions not yet sent.
+        """
+        self._nonces_in_flight -= 1
+        self._nonce_resync = self._nonce_resync or failed
+        if self._nonce_resync and self._nonces_in_flight == 0:
+            self._next_nonce = None
+            self._nonce_resync = False
+    
+    def _sign_transaction(self, transaction: Dict[str, Any]) -> bytes:
+        """Signs transaction with the cached private key and returns raw transaction bytes"""
+        signed_txn = Account.sign_transaction(transaction, self._signing_key)
+        return getattr(signed_txn, RAW_TX_ATTR)
+    
+    async def _send_and_wait(self, web3_instance: AsyncWeb3, raw_transaction: bytes) -> tuple:
+        """Sends raw transaction and returns (tx_hash_hex, receipt)"""
+        rpc_url = web3_instance.provider.endpoint_uri
+        # Known before sending, so a sync call that fails after submission can still be tracked
+        tx_hash = HexBytes(keccak(raw_transaction))
+        
+        if rpc_url not in self._sync_send_unsupported:
+            # EIP-7966: submit and get the receipt back in a single round-trip
+            try:
+                receipt = await web3_instance.manager.coro_request(
+                    'eth_sendRawTransactionSync', [Web3.to_hex(raw_transaction)]
+                )
+            except MethodUnavailable:
+                logger.debug("eth_sendRawTransactionSync not available, falling back to receipt polling")
+                self._sync_send_unsupported.add(rpc_url)
+            except Exception as e:
+                # Not mined within the node's sync timeout (code 4), or the reply was lost:
+                # the transaction may already be in the mempool, so follow it by hash
+                logger.debug(f"eth_sendRawTransactionSync failed for {tx_hash.hex()}, polling for receipt: {e}")
+                try:
+                    await web3_instance.eth.get_transaction(tx_hash)
+                except TransactionNotFound:
+                    await web3_instance.eth.send_raw_transaction(raw_transaction)
+                receipt = await web3_instance.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
+                return tx_hash.hex(), receipt
+            else:
+                # Raw RPC result, quantities are still hex strings
+                return HexBytes(receipt['transactionHash']).hex(), {
+                    'status': Web3.to_int(hexstr=receipt['status']),
+                    'blockNumber': Web3.to_int(hexstr=receipt['blockNumber']),
+                    'gasUsed': Web3.to_int(hexstr=receipt['gasUsed'])
+                }
+        
+        await web3_instance.eth.send_raw_transaction(raw_transaction)
+        receipt = await web3_instance.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
+        return tx_hash.hex(), receipt
+    
+    async def perform_bridge(self, to_address: str, amount: Union[str, float, Decimal], wallet_state: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
+        """Performs bridge, implemented by subclasses
+        
+        Funds are always bridged to the wallet's own address on L2; to_address is
+        only used to label the bridge.
+        """
+        raise NotImplementedError
+    
+    async def perform_bridges(self, amounts: List[Union[str, float, Decimal]], concurrency: int = 8) -> List[Dict[str, Any]]:
+        """Performs several bridges of this wallet to itself concurrently, keeping at most `concurrency` in flight"""
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def bounded(amount: Union[str, float, Decimal]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.perform_bridge(self.address, amount)
+        
+        return await asyncio.gather(*(bounded(amount) for amount in amounts))
\ No newline at end of file
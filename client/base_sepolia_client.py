@@ -3,43 +3,41 @@ Base Sepolia Bridge Client with local transaction building
 """
 
 import logging
-from typing import Dict, Any
-from web3 import Web3
+from decimal import Decimal
+from typing import Dict, Any, Optional, Tuple, Union
+import aiohttp
+from eth_abi import encode
+from eth_utils import function_signature_to_4byte_selector
 from eth_utils.address import to_checksum_address
 
-from .base_client import BaseBridgeClient
+from .base_client import BaseBridgeClient, eth_to_wei, is_rate_limited, is_transient
 
 logger = logging.getLogger(__name__)
 
+# L1StandardBridge.bridgeETHTo(_to, _minGasLimit, _extraData)
+BRIDGE_ETH_TO_SELECTOR = function_signature_to_4byte_selector("bridgeETHTo(address,uint32,bytes)")
+BRIDGE_ETH_TO_TYPES = ['address', 'uint32', 'bytes']
+
+# From sniffer: _extraData = "superbridge" (0x7375706572627269646765)
+EXTRA_DATA = "superbridge".encode('utf-8')
+
 
 class BaseSepoliaBridgeClient(BaseBridgeClient):
     """Client for Base Sepolia Bridge operations with local transaction building"""
     
-    def __init__(self, config: Dict[str, Any]):
-        super().__init__(config)
+    def __init__(self, config: Dict[str, Any], private_key: Optional[str] = None, session: Optional[aiohttp.ClientSession] = None):
+        super().__init__(config, private_key, session)
         
         # Base Sepolia L1StandardBridge contract address (correct one from sniffer)
         self.bridge_contract = "0xfd0Bf71F60660E2f608ed56e1659C450eB113120"
+        self._checksum_bridge = to_checksum_address(self.bridge_contract)
         self.gas_multiplier = config['bridge']['gas_multiplier']
         
-        # L2 RPC connection
-        self.l2_rpc_url = config['networks']['rpcs']['Base_Sepolia']
-        self.w3_l2 = Web3(Web3.HTTPProvider(self.l2_rpc_url))
-        
-        # Base L1StandardBridge contract ABI with bridgeETHTo function
-        self.BRIDGE_ABI = [
-            {
-                "inputs": [
-                    {"internalType": "address", "name": "_to", "type": "address"},
-                    {"internalType": "uint32", "name": "_minGasLimit", "type": "uint32"},
-                    {"internalType": "bytes", "name": "_extraData", "type": "bytes"}
-                ],
-                "name": "bridgeETHTo",
-                "outputs": [],
-                "stateMutability": "payable",
-                "type": "function"
-            }
-        ]
+        # Every argument is fixed per client, so the calldata is encoded once
+        self._calldata = BRIDGE_ETH_TO_SELECTOR + encode(
+            BRIDGE_ETH_TO_TYPES,
+            [self.address, self.get_l2_gas_params(), EXTRA_DATA]
+        )
     
     def calculate_submission_cost(self, gas_prices: dict) -> int:
         """Base doesn't need submission cost like Arbitrum"""
@@ -51,21 +49,26 @@ class BaseSepoliaBridgeClient(BaseBridgeClient):
         min_gas_limit = 200000  # Same as in the successful transaction
         return min_gas_limit
     
-    async def perform_bridge(self, to_address: str, amount: float) -> Dict[str, Any]:
+    async def perform_bridge(self, to_address: str, amount: Union[str, float, Decimal], wallet_state: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
         """Performs bridge using bridgeETHTo function like in sniffer data"""
+        # Once the raw transaction may have reached the node a retry could double-spend
+        broadcast = False
+        # Set once a nonce is reserved, released however the bridge ends
+        nonce = None
+        failed = False
         try:
-            web3 = self._get_web3("Ethereum")
-            gas_prices = self.get_current_gas_prices(web3)
-            amount_wei = int(amount * 10**18)
+            web3 = await self._get_web3("Ethereum")
+            tx_context = await self._prefetch_tx_context(web3, wallet_state)
+            gas_prices = self.get_current_gas_prices(tx_context)
+            amount_wei = eth_to_wei(amount)
             
             # For Base bridge, we only need to send the ETH amount
             required_value = amount_wei
             
             # From sniffer data: gasLimit = 0xb8b13 = 756499
             gas_estimate = 756499
-            min_gas_limit = self.get_l2_gas_params()
             
-            balance_check = self.check_wallet_balance(web3, self.address, required_value, gas_prices, gas_estimate)
+            balance_check = self.check_wallet_balance(tx_context['balance'], required_value, gas_prices, gas_estimate)
             if not balance_check['sufficient']:
                 return {
                     'success': False, 
@@ -73,41 +76,23 @@ class BaseSepoliaBridgeClient(BaseBridgeClient):
                     'balance_info': balance_check
                 }
             
-            bridge_contract = web3.eth.contract(
-                address=to_checksum_address(self.bridge_contract),
-                abi=self.BRIDGE_ABI
-            )
-            
-            # From sniffer: _extraData = "superbridge" (0x7375706572627269646765)
-            extra_data = "superbridge".encode('utf-8')
-            
-            transaction = bridge_contract.functions.bridgeETHTo(
-                to_checksum_address(self.address),  # _to
-                min_gas_limit,                      # _minGasLimit
-                extra_data                          # _extraData
-            ).build_transaction({
-                'from': self.address,
+            nonce = self._reserve_nonce(tx_context['nonce'])
+            transaction = {
+                'to': self._checksum_bridge,
+                'data': self._calldata,
                 'value': required_value,
                 'gas': gas_estimate,
                 'maxPriorityFeePerGas': gas_prices['max_priority_fee'],
                 'maxFeePerGas': gas_prices['max_fee_per_gas'],
-                'nonce': web3.eth.get_transaction_count(self.address, 'pending'),
-                'chainId': 11155111,
+                'nonce': nonce,
+                'chainId': self.chain_id,
                 'type': 2
-            })
-            
-            signed_txn = web3.eth.account.sign_transaction(transaction, self.private_key)
-            
-            # Handle both Web3.py versions
-            try:
-                raw_transaction = signed_txn.raw_transaction
-            except AttributeError:
-                raw_transaction = signed_txn.rawTransaction
+            }
             
-            tx_hash = web3.eth.send_raw_transaction(raw_transaction)
-            tx_hash_hex = tx_hash.hex()
+            raw_transaction = self._sign_transaction(transaction)
             
-            receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=300)
+            broadcast = True
+            tx_hash_hex, receipt = await self._send_and_wait(web3, raw_transaction)
             
             if receipt['status'] == 1:
                 return {
@@ -121,4 +106,13 @@ class BaseSepoliaBridgeClient(BaseBridgeClient):
                 return {'success': False, 'error': 'Transaction reverted'}
                 
         except Exception as e:
-            return {'success': False, 'error': str(e)}
\ No newline at end of file
+            failed = True
+            return {
+                'success': False,
+                'error': str(e),
+                'rate_limited': is_rate_limited(e),
+                'retryable': not broadcast and is_transient(e)
+            }
+        finally:
+            if nonce is not None:
+                self._release_nonce(failed)
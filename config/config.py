@@ -3,22 +3,28 @@ Configuration module with TOML support
 """
 
 import os
+from functools import lru_cache
 from typing import Dict, Any
-import tomli as tomllib
 
+try:
+    import tomllib  # Python 3.11+
+except ImportError:
+    import tomli as tomllib
 
+# Point to config.toml in root directory (parent of config folder)
+CONFIG_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CONFIG_DIR)
+CONFIG_PATH = os.path.join(ROOT_DIR, "config.toml")
+
+
+@lru_cache(maxsize=1)
 def load_config() -> Dict[str, Any]:
-    """Loads configuration from config.toml and returns complete config"""
-    # Point to config.toml in root directory (parent of config folder)
-    config_dir = os.path.dirname(os.path.abspath(__file__))
-    root_dir = os.path.dirname(config_dir)
-    config_path = os.path.join(root_dir, "config.toml")
-    
-    if not os.path.exists(config_path):
-        raise FileNotFoundError(f"Configuration file {config_path} not found")
+    """Loads configuration from config.toml and returns complete config (parsed once per process)"""
+    if not os.path.exists(CONFIG_PATH):
+        raise FileNotFoundError(f"Configuration file {CONFIG_PATH} not found")
     
     try:
-        with open(config_path, "rb") as f:
+        with open(CONFIG_PATH, "rb") as f:
             config = tomllib.load(f)
     except Exception as e:
         raise RuntimeError(f"Error reading configuration: {e}")
@@ -65,5 +71,8 @@ def load_config() -> Dict[str, Any]:
 
 
 def get_config() -> Dict[str, Any]:
-    """Returns complete configuration"""
+    """Returns complete configuration
+    
+    The dict is cached and shared by all callers, treat it as read-only.
+    """
     return load_config()
\ No newline at end of file
@@ -5,10 +5,20 @@ Supports ETH → Arbitrum bridge from multiple wallets
 """
 
 import asyncio
+import functools
+import random
+import re
+import threading
+import time
+from collections import Counter
+from array import array
 import logging
 import warnings
-from typing import Dict, Any, List
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Any, Callable, Final, List, Optional, Tuple
 from eth_account import Account
+import aiohttp
+from aiolimiter import AsyncLimiter
 from rich.console import Console
 from rich.text import Text
 from rich.panel import Panel
@@ -20,6 +30,7 @@ warnings.filterwarnings("ignore", message="pkg_resources is deprecated")
 
 # Client imports
 from client.arbitrum_client import ArbitrumBridgeClient
+from client.base_client import BaseBridgeClient, compute_fees, eth_to_wei
 from client.base_sepolia_client import BaseSepoliaBridgeClient
 from config import get_config
 
@@ -32,22 +43,106 @@ def setup_logging(config: Dict[str, Any]) -> logging.Logger:
     )
     return logging.getLogger(__name__)
 
+# One private key per line, optionally 0x-prefixed; comments and malformed lines never match
+KEY_RE = re.compile(rb'(?m)^[ \t]*((?:0x)?[0-9a-f]{64})[ \t]*\r?$', re.IGNORECASE)
+# Any line that is neither blank nor a comment
+ENTRY_RE = re.compile(rb'(?m)^[ \t]*[^#\s]')
+
+# Wallets per JSON-RPC batch in the pre-flight (2 requests each)
+PREFLIGHT_BATCH_SIZE = 100
+
+# Snapshot older than one block (~12s) is fetched again before the run starts
+PREFLIGHT_MAX_AGE = 12.0
+
+# Open sockets per RPC endpoint in the shared HTTP session
+CONNECTIONS_PER_HOST = 20
+
+# Upper bound for a single retry backoff, in seconds
+MAX_RETRY_DELAY = 30
+
+# Destination chain name and config section per bridge mode
+BRIDGE_NAMES: Final = {1: "Arbitrum", 2: "Base Sepolia"}
+BRIDGE_CONFIGS: Final = {1: 'arbitrum', 2: 'base'}
+
+# Per-wallet output lines
+WALLET_TMPL: Final = "\n📤 Wallet {}/{}: {}"
+SUCCESS_TMPL: Final = "✅ Bridge successful for {}: tx hash {}"
+FAILURE_TMPL: Final = "❌ {}: {}"
+PROGRESS_TMPL: Final = "📈 Progress: {}/{} (✅ {} / ❌ {})"
+
 # Logging setup
 config = get_config()
 logger = setup_logging(config['logging'])
 
 
+@functools.lru_cache(maxsize=4096)
+def _derive_address(private_key: str) -> Optional[str]:
+    """Derives wallet address from private key, None if the key is invalid"""
+    try:
+        return Account.from_key(private_key).address
+    except Exception as e:
+        logger.error(f"Error processing key {private_key[:10]}...: {e}")
+        return None
+
+
+async def _ainput(prompt: str = "") -> str:
+    """Reads a line from stdin in a worker thread so the event loop keeps running
+    
+    The thread is a daemon: a prompt still waiting when the loop is cancelled
+    (Ctrl+C) must not keep the interpreter from exiting, which a to_thread
+    worker blocked in input() would.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def deliver(outcome: Callable[[], None]):
+        # Nobody is waiting any more once the prompt was cancelled or the loop closed
+        try:
+            loop.call_soon_threadsafe(lambda: future.done() or outcome())
+        except RuntimeError:
+            pass
+    
+    def read():
+        try:
+            line = input(prompt)
+        except BaseException as e:
+            error = e  # `e` is unbound once the except block ends
+            deliver(lambda: future.set_exception(error))
+        else:
+            deliver(lambda: future.set_result(line))
+    
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
+
 class BridgeService:
     """Class for mass bridge operations with multiple modes"""
     
-    def __init__(self):
-        self.config = get_config()
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        # Reuses the config loaded at startup when one is passed in
+        self.config = config if config is not None else get_config()
         self.console = Console()
+        # Static screens, rendered again on every return to the menu
+        self._welcome_panel = self._build_welcome_panel()
+        self._menu_panel = self._build_menu_panel()
+        # Clients are pure functions of key and mode, keep them for the whole
+        # session so menu re-runs reuse connections
+        self._client_cache: Dict[Tuple[int, str], BaseBridgeClient] = {}
+        # Token bucket pacing bridge submissions, configured per run
+        self.limiter: Optional[AsyncLimiter] = None
+        # HTTP session shared by the pre-flight and all cached clients,
+        # created on the first run and closed on exit
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Admission control for wallet tasks: a plain counter guarded by a
+        # condition so the cap can shrink mid-run when the RPC rate-limits us
+        self._active = 0
+        self._cmax = 1
+        self._cond = asyncio.Condition()
+        # Bridges in flight by (mode, address, amount), duplicates await the same result
+        self._inflight: Dict[Tuple[int, str, Decimal], asyncio.Future] = {}
         
-    def display_welcome(self):
-        """Displays welcome screen with logo."""
-        self.console.clear()
-        
+    def _build_welcome_panel(self) -> Panel:
+        """Builds welcome panel with logo"""
         combined_text = Text()
         combined_text.append("\n📢 Channel: ", style="bold white")
         combined_text.append("https://t.me/D3_vin", style="cyan")
@@ -59,7 +154,7 @@ class BridgeService:
         combined_text.append("1.2", style="green")
         combined_text.append("\n")
 
-        info_panel = Panel(
+        return Panel(
             Align.left(combined_text),
             title="[bold blue]🌉 Mass SEPOLIA Bridge[/bold blue]",
             subtitle="[bold magenta]Dev by D3vin[/bold magenta]",
@@ -68,12 +163,9 @@ class BridgeService:
             padding=(0, 1),
             width=50
         )
-
-        self.console.print(info_panel)
-        self.console.print()
-        
-    def display_menu(self) -> int:
-        """Displays mode selection menu and returns user choice"""
+    
+    def _build_menu_panel(self) -> Panel:
+        """Builds mode selection menu panel"""
         menu_text = Text()
         menu_text.append("\n📝 Select operation mode:\n\n", style="bold yellow")
         menu_text.append("1. ", style="bold white")
@@ -84,7 +176,7 @@ class BridgeService:
         menu_text.append("Exit", style="red")
         menu_text.append("\n")
 
-        menu_panel = Panel(
+        return Panel(
             Align.left(menu_text),
             title="[bold blue]📝 Mode Selection[/bold blue]",
             box=box.ROUNDED,
@@ -92,32 +184,43 @@ class BridgeService:
             padding=(0, 1),
             width=50
         )
-
-        self.console.print(menu_panel)
+        
+    def display_welcome(self):
+        """Displays welcome screen with logo."""
+        self.console.clear()
+        self.console.print(self._welcome_panel)
+        self.console.print()
+        
+    async def display_menu(self) -> int:
+        """Displays mode selection menu and returns user choice"""
+        self.console.print(self._menu_panel)
         
         while True:
             try:
-                choice = input("\n🔢 Enter mode number (1-3): ").strip()
+                choice = (await _ainput("\n🔢 Enter mode number (1-3): ")).strip()
                 if choice in ['1', '2', '3']:
                     return int(choice)
                 else:
                     print("❌ Invalid choice. Enter 1, 2 or 3.")
-            except KeyboardInterrupt:
-                print("\n\n❌ Operation cancelled by user")
+            except EOFError:
                 return 3
             except Exception:
                 print("❌ Invalid input. Enter 1, 2 or 3.")
         
-    def load_private_keys(self, filename: str = "p_key.txt") -> List[str]:
-        """Loads private keys from file"""
+    async def load_private_keys(self, filename: str = "p_key.txt") -> List[str]:
+        """Loads private keys from file without blocking the event loop"""
+        return await asyncio.to_thread(self._load_private_keys_sync, filename)
+    
+    def _load_private_keys_sync(self, filename: str) -> List[str]:
+        """Reads private keys from file (blocking)"""
         try:
-            with open(filename, 'r') as f:
-                keys = []
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        keys.append(line)
-                return keys
+            with open(filename, 'rb') as f:
+                data = f.read()
+            keys = [key.decode('ascii') for key in KEY_RE.findall(data)]
+            malformed = len(ENTRY_RE.findall(data)) - len(keys)
+            if malformed:
+                logger.warning(f"Skipped {malformed} malformed line(s) in {filename}")
+            return keys
         except FileNotFoundError:
             logger.error(f"File {filename} not found!")
             return []
@@ -125,40 +228,107 @@ class BridgeService:
             logger.error(f"Error reading file {filename}: {e}")
             return []
     
-    async def create_client_for_wallet(self, private_key: str, bridge_mode: int):
-        """Creates client for specific wallet based on bridge mode"""
-        # Create config copy with needed private key
-        wallet_config = self.config.copy()
-        wallet_config['wallet']['ethereum_private_key'] = private_key
+    def create_client_for_wallet(self, private_key: str, bridge_mode: int) -> BaseBridgeClient:
+        """Returns cached client for specific wallet based on bridge mode, creating it on first use"""
+        client = self._client_cache.get((bridge_mode, private_key))
+        if client is not None:
+            return client
         
+        # All clients share the config, the wallet key is passed on its own
         if bridge_mode == 1:  # Arbitrum
-            return ArbitrumBridgeClient(wallet_config)
+            client = ArbitrumBridgeClient(self.config, private_key=private_key, session=self._session)
         elif bridge_mode == 2:  # Base (заглушка)
-            return BaseSepoliaBridgeClient(wallet_config)
+            client = BaseSepoliaBridgeClient(self.config, private_key=private_key, session=self._session)
         else:
             raise ValueError(f"Unsupported bridge mode: {bridge_mode}")
+        
+        self._client_cache[(bridge_mode, private_key)] = client
+        return client
+    
+    async def _acquire(self):
+        """Waits for a free wallet slot under the current concurrency cap"""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._active < self._cmax)
+            self._active += 1
+    
+    async def _release(self):
+        """Frees a wallet slot and wakes up one waiter"""
+        async with self._cond:
+            self._active -= 1
+            self._cond.notify(1)
+    
+    async def _throttle(self):
+        """Halves the concurrency cap after the RPC answered with HTTP 429"""
+        async with self._cond:
+            if self._cmax > 1:
+                self._cmax = max(1, self._cmax // 2)
+                logger.warning(f"RPC rate limit hit, concurrency lowered to {self._cmax}")
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Gets or creates the HTTP session shared by all clients"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=CONNECTIONS_PER_HOST, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+    
+    async def close(self):
+        """Closes cached clients and the shared HTTP session"""
+        for client in self._client_cache.values():
+            await client.close()
+        self._client_cache.clear()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+    
+    async def perform_bridge_for_wallet(self, private_key: str, wallet_address: str, amount: Decimal, bridge_mode: int, wallet_state: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
+        """Performs bridge for one wallet, coalescing identical bridges already in flight"""
+        key = (bridge_mode, wallet_address, amount)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            # Shielded so a cancelled duplicate doesn't cancel the original bridge;
+            # marked so the single transaction isn't counted twice
+            return {**await asyncio.shield(pending), 'coalesced': True}
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._bridge_wallet(private_key, wallet_address, amount, bridge_mode, wallet_state)
+            future.set_result(result)
+            return result
+        finally:
+            if not future.done():
+                future.cancel()
+            del self._inflight[key]
     
-    async def perform_bridge_for_wallet(self, private_key: str, wallet_address: str, amount: float, bridge_mode: int, delay: int = 5) -> Dict[str, Any]:
+    async def _bridge_wallet(self, private_key: str, wallet_address: str, amount: Decimal, bridge_mode: int, wallet_state: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
         """Performs bridge for one wallet with dynamic pricing"""
         try:
-            client = await self.create_client_for_wallet(private_key, bridge_mode)
+            client = self.create_client_for_wallet(private_key, bridge_mode)
             
-            bridge_name = "Arbitrum" if bridge_mode == 1 else "Base Sepolia"
-            logger.debug(f"Performing {bridge_name} bridge for {wallet_address} with amount {amount} ETH")
+            logger.debug("Performing %s bridge for %s with amount %s ETH", BRIDGE_NAMES.get(bridge_mode), wallet_address, amount)
             
-            # Perform bridge with dynamic pricing
-            result = await client.perform_bridge(wallet_address, amount)
+            max_retries = self.config['api']['max_retries']
+            retry_delay = self.config['api']['retry_delay']
+            for attempt in range(max_retries + 1):
+                # Perform bridge with dynamic pricing, waiting only if the rate limit is reached;
+                # retries fetch balance and nonce again instead of reusing the pre-flight pair
+                async with self.limiter:
+                    result = await client.perform_bridge(wallet_address, amount, wallet_state if attempt == 0 else None)
+                
+                if result.get('rate_limited'):
+                    await self._throttle()
+                
+                # Only transient RPC errors hit before the transaction was sent are retried
+                if not result.get('retryable') or attempt == max_retries:
+                    break
+                delay = min(retry_delay * 2 ** attempt, MAX_RETRY_DELAY) * random.uniform(0.5, 1.5)
+                logger.warning(f"{wallet_address}: {result['error']}, retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
             
             if result['success']:
-                if bridge_mode == 2:  # Base Sepolia stub
-                    print(f"✅ Bridge successful for {wallet_address}: tx hash {result['tx_hash']}")
-                else:
-                    print(f"✅ Bridge successful for {wallet_address}: tx hash {result['tx_hash']}")
-                    #if 'tx_url' in result:
-                        #print(f"   View: {result['tx_url']}")                
+                print(SUCCESS_TMPL.format(wallet_address, result['tx_hash']))
             else:
                 error_msg = result.get('error', 'Unknown error')
-                print(f"❌ {wallet_address}: {error_msg}")
+                print(FAILURE_TMPL.format(wallet_address, error_msg))
                 
                 # Display balance info for insufficient funds error
                 if error_msg == 'Insufficient funds' and 'balance_info' in result:
@@ -169,10 +339,6 @@ class BridgeService:
                     print(f"   ⛽ Gas cost: {balance_info['gas_cost_eth']:.6f} ETH")
                     shortage = balance_info['required_eth'] - balance_info['balance_eth']
                     print(f"   📉 Shortage: {shortage:.6f} ETH")
-            # Delay between wallets
-            if delay > 0:
-                print(f"Delay {delay} seconds...")
-                await asyncio.sleep(delay)
             
             return result
             
@@ -182,72 +348,201 @@ class BridgeService:
             print(f"❌ {error_msg}")
             return {'success': False, 'error': str(e)}
     
+    async def _batch_preflight(self, session: aiohttp.ClientSession, addrs: List[str]) -> Tuple[List[Optional[int]], array, Optional[int]]:
+        """Fetches pending balance and nonce of all wallets with batched JSON-RPC requests
+        
+        Returns (balances, nonces, max_fee_per_gas) with balances and nonces aligned
+        with addrs. Wallets whose reply failed keep a None balance and fetch their own
+        state; max_fee_per_gas is computed like the clients do and is None if the fee
+        replies failed.
+        """
+        rpc_url = self.config['networks']['rpcs']['Ethereum']
+        count = len(addrs)
+        # Balances are plain ints, a funded testnet wallet can exceed 2**64 wei
+        balances: List[Optional[int]] = [None] * count
+        nonces = array('Q', bytes(8 * count))
+        max_fee_per_gas: Optional[int] = None
+        # Ids right after the last wallet request, asked once with the first chunk
+        fee_history_id, gas_price_id = 2 * count, 2 * count + 1
+        
+        async def fetch_chunk(start: int, end: int):
+            nonlocal max_fee_per_gas
+            payload = []
+            if start == 0:
+                payload.append({'jsonrpc': '2.0', 'id': fee_history_id, 'method': 'eth_feeHistory', 'params': ['0x2', 'latest', []]})
+                payload.append({'jsonrpc': '2.0', 'id': gas_price_id, 'method': 'eth_gasPrice', 'params': []})
+            for i in range(start, end):
+                payload.append({'jsonrpc': '2.0', 'id': 2 * i, 'method': 'eth_getBalance', 'params': [addrs[i], 'pending']})
+                payload.append({'jsonrpc': '2.0', 'id': 2 * i + 1, 'method': 'eth_getTransactionCount', 'params': [addrs[i], 'pending']})
+            
+            async with session.post(rpc_url, json=payload) as response:
+                response.raise_for_status()
+                replies = {reply['id']: reply for reply in await response.json()}
+            
+            fee_history, gas_price = replies.get(fee_history_id, {}), replies.get(gas_price_id, {})
+            if 'result' in fee_history and 'result' in gas_price:
+                # baseFeePerGas = [block n-1, block n, next block]
+                base_fees = [int(base_fee, 16) for base_fee in fee_history['result']['baseFeePerGas']]
+                max_fee_per_gas = compute_fees(base_fees[1], base_fees[0], int(gas_price['result'], 16))[1]
+            for i in range(start, end):
+                balance, nonce = replies.get(2 * i, {}), replies.get(2 * i + 1, {})
+                if 'result' in balance and 'result' in nonce:
+                    balances[i] = int(balance['result'], 16)
+                    nonces[i] = int(nonce['result'], 16)
+        
+        # Every chunk runs to completion before returning, so no late write can
+        # land in the arrays once the caller starts reading them
+        starts = range(0, count, PREFLIGHT_BATCH_SIZE)
+        outcomes = await asyncio.gather(
+            *[fetch_chunk(start, min(start + PREFLIGHT_BATCH_SIZE, count)) for start in starts],
+            return_exceptions=True
+        )
+        for start, outcome in zip(starts, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning(f"Batch pre-flight failed for wallets {start + 1}-{min(start + PREFLIGHT_BATCH_SIZE, count)}, they will fetch their own state: {outcome}")
+        
+        return balances, nonces, max_fee_per_gas
+    
+    async def _prompt_settings(self, wallet_count: int, bridge_name: str) -> Optional[Tuple[Decimal, float, int]]:
+        """Asks for amount, rate and concurrency, returns None if the run is called off"""
+        try:
+            amount = Decimal(await _ainput(f"\nEnter bridge amount in ETH (default 0.0001): ") or "0.0001")
+        except InvalidOperation:
+            print("❌ Invalid amount")
+            return None
+        if not amount.is_finite() or amount <= 0:
+            print("❌ Amount must be a positive number")
+            return None
+        rps = float(await _ainput(f"Enter max bridges per second (default 1): ") or "1")
+        if rps <= 0:
+            print("❌ Rate must be greater than 0")
+            return None
+        concurrency = max(1, int(await _ainput(f"Enter max wallets in parallel (default 5): ") or "5"))
+
+        # Confirmation
+        confirm = (await _ainput(f"\nStart bridge with {wallet_count} wallets for {amount} ETH each via {bridge_name}? (y/N): ")).strip().lower()
+        if confirm != 'y':
+            print("❌ Operation cancelled")
+            return None
+        
+        return amount, rps, concurrency
+    
     async def mass_bridge(self, bridge_mode: int):
         """Performs mass bridge for selected mode"""
-        bridge_names = {1: "Arbitrum", 2: "Base Sepolia"}
-        bridge_name = bridge_names.get(bridge_mode, "Unknown")
+        bridge_name = BRIDGE_NAMES.get(bridge_mode, "Unknown")
         
         # Load private keys
-        private_keys = self.load_private_keys()
+        private_keys = await self.load_private_keys()
         if not private_keys:
             print("❌ No private keys found in p_key.txt file")
             return
         
-        # Get wallet addresses
-        wallets = []
-        for private_key in private_keys:
-            try:
-                account = Account.from_key(private_key)
-                wallets.append((private_key, account.address))
-            except Exception as e:
-                logger.error(f"Error processing key {private_key[:10]}...: {e}")
-                continue
+        # Get wallet addresses, derived in worker threads and cached across runs
+        addresses = await asyncio.gather(
+            *[asyncio.to_thread(_derive_address, private_key) for private_key in private_keys]
+        )
+        # Wallet data is kept as parallel arrays indexed by wallet position
+        pks = [private_key for private_key, address in zip(private_keys, addresses) if address is not None]
+        addrs = [address for address in addresses if address is not None]
+        count = len(addrs)
         
-        if not wallets:
+        if not count:
             print("❌ Failed to process any private key")
             return
         
-        print(f"📊 Found wallets: {len(wallets)}")
+        print(f"📊 Found wallets: {count}")
         print(f"🌉 Bridge mode: ETH Sepolia → {bridge_name}")
         
-        # Settings
-        amount = float(input(f"\nEnter bridge amount in ETH (default 0.0001): ") or "0.0001")
-        delay = int(input(f"Enter delay between wallets (seconds, default 15): ") or "15")
-
-        # Confirmation
-        confirm = input(f"\nStart bridge with {len(wallets)} wallets for {amount} ETH each via {bridge_name}? (y/N): ").strip().lower()
-        if confirm != 'y':
-            print("❌ Operation cancelled")
+        # One batched round-trip for all balances and nonces instead of one per wallet,
+        # running in the background while the user answers the prompts below
+        preflight = asyncio.create_task(self._batch_preflight(self._get_session(), addrs))
+        preflight_started = time.monotonic()
+        
+        try:
+            settings = await self._prompt_settings(count, bridge_name)
+        except BaseException:
+            preflight.cancel()
+            raise
+        if settings is None:
+            preflight.cancel()
             return
+        amount, rps, concurrency = settings
         
-        # Perform bridge for each wallet
+        # Perform bridge for all wallets, at most `concurrency` at a time
         print(f"\n🚀 Starting mass bridge via {bridge_name}...")
         
-        success_count = 0
-        failed_count = 0
+        # Balances and nonces are handed to the clients as-is, don't use a snapshot
+        # that may predate transactions sent while the user was answering
+        if time.monotonic() - preflight_started > PREFLIGHT_MAX_AGE:
+            preflight.cancel()
+            preflight = asyncio.create_task(self._batch_preflight(self._get_session(), addrs))
+        balances, nonces, max_fee_per_gas = await preflight
         
-        for i, (private_key, wallet_address) in enumerate(wallets, 1):
-            print(f"\n📤 Wallet {i}/{len(wallets)}: {wallet_address}")
-            
-            result = await self.perform_bridge_for_wallet(
-                private_key, 
-                wallet_address,
-                amount,
-                bridge_mode,
-                delay if i < len(wallets) else 0  # No delay after the last wallet
-            )
-            
-            if result['success']:
-                success_count += 1
-            else:
-                failed_count += 1
+        # Wallets that can't cover the amount plus gas are skipped without a task. Same
+        # check as the clients' own (gas limit * max fee) at the snapshot's fee inputs;
+        # clients add bridge-specific costs on top, so they would reject these as well
+        if max_fee_per_gas is not None:
+            gas_limit = self.config[BRIDGE_CONFIGS[bridge_mode]]['default_gas_limit']
+            required_wei = eth_to_wei(amount) + max_fee_per_gas * gas_limit
+            indices = [i for i, balance in enumerate(balances) if balance is None or balance >= required_wei]
+        else:
+            indices = list(range(count))
+        skipped_count = count - len(indices)
+        if skipped_count:
+            print(f"⏭️ Skipping {skipped_count} wallet(s) with insufficient funds")
+        
+        self._active, self._cmax = 0, concurrency
+        # Average rate of `rps`, bursts of up to max(1, rps) submissions
+        capacity = max(1.0, rps)
+        self.limiter = AsyncLimiter(capacity, capacity / rps)
+        
+        # Finished wallets report here so progress is shown as results come in
+        finished: asyncio.Queue = asyncio.Queue()
+        tally: Counter = Counter()
+        total = len(indices)
+        
+        async def _run(i: int):
+            result = None
+            try:
+                print(WALLET_TMPL.format(i + 1, count, addrs[i]))
+                wallet_state = (balances[i], nonces[i]) if balances[i] is not None else None
+                result = await self.perform_bridge_for_wallet(pks[i], addrs[i], amount, bridge_mode, wallet_state)
+            finally:
+                # Reported even if the task failed, so the consumer never waits forever
+                finished.put_nowait(result)
+                await self._release()
+        
+        async def _consume():
+            for done in range(1, total + 1):
+                result = await finished.get()
+                if isinstance(result, dict) and result.get('coalesced'):
+                    tally['duplicate'] += 1
+                else:
+                    # Anything but a successful result dict is a failure
+                    tally[isinstance(result, dict) and bool(result.get('success'))] += 1
+                print(PROGRESS_TMPL.format(done, total, tally[True], tally[False]))
+        
+        # A slot is taken before the task is created, so at most `concurrency`
+        # tasks exist at any time instead of one coroutine per wallet up front
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(_consume())
+            for i in indices:
+                await self._acquire()
+                tg.create_task(_run(i))
+        
+        success_count, failed_count = tally[True], tally[False]
         
         # Final statistics
         print(f"\n📊 Final statistics:")
         print(f"✅ Successful: {success_count}")
         print(f"❌ Failed: {failed_count}")
-        if wallets:
-            success_rate = (success_count / len(wallets)) * 100
+        print(f"⏭️ Skipped: {skipped_count}")
+        if tally['duplicate']:
+            print(f"🔁 Duplicates: {tally['duplicate']}")
+        # Skipped wallets and duplicates were never attempted, keep them out of the rate
+        attempted = success_count + failed_count
+        if attempted:
+            success_rate = (success_count / attempted) * 100
             print(f"📈 Success rate: {success_rate:.1f}%")
 
     async def main(self):
@@ -256,7 +551,7 @@ class BridgeService:
             self.display_welcome()
             
             while True:
-                choice = self.display_menu()
+                choice = await self.display_menu()
                 
                 if choice == 1:
                     print(f"\n🌉 Starting mode: ETH Sepolia → ARB Sepolia")
@@ -270,22 +565,30 @@ class BridgeService:
                     
                 # Return to menu on Enter, exit on any other key
                 if choice in [1, 2]:
-                    input("\n🔁 Press Enter to return to menu (any other key to exit): ")
+                    await _ainput("\n🔁 Press Enter to return to menu (any other key to exit): ")
                     self.display_welcome()  # Return to menu
                     continue
                         
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            # Ctrl+C cancels the main task while a prompt is waiting in its thread;
+            # re-raised so asyncio.run stops instead of treating it as a normal return
             print("\n\n❌ Operation cancelled by user")
+            raise
         except Exception as e:
             logger.error(f"Critical error: {e}")
             print(f"❌ Error occurred: {e}")
+        finally:
+            await self.close()
 
 
 async def main():
     """Entry point"""
-    bridge_service = BridgeService()
+    bridge_service = BridgeService(config)
     await bridge_service.main()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
\ No newline at end of file